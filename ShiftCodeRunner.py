@@ -173,17 +173,16 @@ def collect_new_codes(csv_path: Path, url: str) -> tuple[List[str], dict[str, st
     """Scrape and append any new codes; return (new_codes, expirations_map)."""
     scraper.ensure_csv_header(csv_path)
     existing = scraper.read_existing_codes(csv_path)
-    html = scraper.fetch_html(url)
+    html = scraper.fetch_html(url, cache_path=scraper.page_cache_path(csv_path))
+    soup = scraper.make_soup(html)
     scraped = scraper.extract_codes(html)
-    # Exclude expired section
-    expired = scraper.extract_expired_codes(html)
-    if expired:
-        scraped = [c for c in scraped if c not in expired]
-    new_codes = [c for c in scraped if c not in existing]
+    # Exclude expired-section and already-recorded codes in one pass
+    excluded = existing | scraper.extract_expired_codes(soup)
+    new_codes = sorted(scraped - excluded)
     # Write with expiration mapping
-    exp_map = scraper.extract_code_expirations(html)
+    exp_map = scraper.extract_code_expirations(soup)
     import datetime as dt
-    today = dt.datetime.now().strftime("%Y-%m-%d")
+    today = dt.date.today().isoformat()
     scraper.write_new_codes(csv_path, new_codes, today, expirations=exp_map)
     return new_codes, exp_map
 
@@ -259,4 +258,7 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    try:
+        raise SystemExit(main())
+    finally:
+        scraper.close_session()
@@ -17,19 +17,34 @@ Notes
 from __future__ import annotations
 
 import argparse
+import bisect
 import csv
 import datetime as dt
+import functools
+import itertools
+import json
 import logging
+import os
 import re
+import shutil
 import sys
+import tempfile
 from pathlib import Path
-from typing import Iterable, List, Sequence, Set
+from typing import FrozenSet, Iterable, Sequence, Set
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+# lxml is a much faster HTML parser; fall back to the stdlib one when absent
+try:
+    import lxml  # noqa: F401
+
+    _PARSER = "lxml"
+except ImportError:
+    _PARSER = "html.parser"
+
 # Defaults and configuration
 DEFAULT_URL = "https://www.ign.com/wikis/borderlands-4/Borderlands_4_SHiFT_Codes"
 DEFAULT_CSV = "shift_codes.csv"
@@ -44,8 +59,17 @@ USER_AGENT = (
 CLASS_TAG_DEFAULT = "span"
 CLASS_TOKENS_DEFAULT: Sequence[str] = ("task-name", "bold", "small")
 
-# Regex pattern for valid SHiFT codes (5 groups of 5 alphanumerics, hyphen separated)
-CODE_REGEX = re.compile(r"^[A-Z0-9]{5}(?:-[A-Z0-9]{5}){4}$")
+# Regex pattern for valid SHiFT codes (5 groups of 5 alphanumerics, hyphen separated);
+# unanchored, so validate a whole token with CODE_REGEX.fullmatch()
+CODE_REGEX = re.compile(r"[A-Z0-9]{5}(?:-[A-Z0-9]{5}){4}")
+# Finds code-shaped runs inside free text; the lookarounds reject runs that
+# are part of a longer hyphenated alphanumeric token. No capture groups, so
+# findall() returns the matched strings directly
+CODE_SCAN = re.compile(r"(?<![A-Za-z0-9-])[A-Za-z0-9]{5}(?:-[A-Za-z0-9]{5}){4}(?![A-Za-z0-9-])")
+
+# Markup whose contents never render as page text; blanked out before the raw
+# HTML scan so script data and comments are not mistaken for listed codes
+_NON_CONTENT_REGEX = re.compile(r"<(script|style)\b.*?</\1\s*>|<!--.*?-->", re.S | re.I)
 
 
 def setup_logger(verbose: bool = False) -> None:
@@ -56,23 +80,45 @@ def setup_logger(verbose: bool = False) -> None:
     )
 
 
+def make_soup(html: str) -> BeautifulSoup:
+    """Parse HTML with lxml when available, else the built-in html.parser."""
+    return BeautifulSoup(html, _PARSER)
+
+
 def requests_session() -> requests.Session:
     """Create a requests session with basic retry/backoff."""
     session = requests.Session()
+    # Short, capped backoff: this is a one-shot scraper, not a long-running client
     retry = Retry(
-        total=3,
-        backoff_factor=0.5,
+        total=2,
+        backoff_factor=0.2,
+        backoff_max=1.0,
         status_forcelist=(429, 500, 502, 503, 504),
-        allowed_methods=("GET",),
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
         raise_on_status=False,
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    # One pool per host (page + webhook); the script never issues concurrent requests
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=2, pool_maxsize=1)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     session.headers.update({"User-Agent": USER_AGENT})
     return session
 
 
+@functools.lru_cache(maxsize=1)
+def _session() -> requests.Session:
+    """Return the shared session so connections are kept alive across requests."""
+    return requests_session()
+
+
+def close_session() -> None:
+    """Close the shared session (if created) and drop it from the cache."""
+    if _session.cache_info().currsize:
+        _session().close()
+    _session.cache_clear()
+
+
 def ensure_csv_header(path: Path) -> None:
     """Ensure CSV exists with a header including Expiration.
 
@@ -92,29 +138,42 @@ def ensure_csv_header(path: Path) -> None:
 
     # Attempt header upgrade if we detect the older 3-column header
     try:
-        lines = path.read_text(encoding="utf-8").splitlines()
-        if lines:
-            first = lines[0].strip().lower()
-            if first == ",".join(["code", "date added", "redeemed"]):
-                # Rewrite with new header, insert blank Expiration for existing rows if any
-                upgraded = [",".join(desired_header)]
-                for row in csv.reader(lines[1:]):
-                    if not row:
-                        continue
+        # Only the header decides whether an upgrade is needed; avoid reading
+        # the whole file on the common (already upgraded) path
+        with path.open("rb") as f:
+            first = f.readline().decode("utf-8").strip().lower()
+        if first == ",".join(["code", "date added", "redeemed"]):
+            # Stream rows into a sibling temp file with the new header, inserting a
+            # blank Expiration, then swap it over the original
+            tmp_name = None
+            try:
+                with path.open("r", newline="", encoding="utf-8") as src, tempfile.NamedTemporaryFile(
+                    "w", newline="", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False
+                ) as dst:
+                    tmp_name = dst.name
+                    next(src, None)
+                    writer = csv.writer(dst)
+                    writer.writerow(desired_header)
                     # Insert empty Expiration between Date Added and Redeemed
-                    if len(row) >= 3:
-                        upgraded.append(
-                            ",".join([row[0], row[1], "", row[2]])
-                        )
-                    else:
-                        upgraded.append(
-                            ",".join([row[0] if row else "", "", "", "No"])
-                        )
-                path.write_text("\n".join(upgraded) + "\n", encoding="utf-8")
-    except Exception:
+                    writer.writerows(
+                        [row[0], row[1], "", row[2]] if len(row) >= 3 else [row[0], "", "", "No"]
+                        for row in csv.reader(src)
+                        if row
+                    )
+                # NamedTemporaryFile is created 0600; keep the CSV's own mode
+                shutil.copymode(path, tmp_name)
+                os.replace(tmp_name, path)
+            except Exception:
+                # Covers a failed swap too (e.g. the CSV locked on Windows)
+                if tmp_name:
+                    try:
+                        os.unlink(tmp_name)
+                    except OSError:
+                        pass
+                raise
+    except Exception as exc:
         # Be conservative: if anything odd, leave file as-is
-        pass
-
+        logging.warning("Could not upgrade CSV header in '%s'; leaving it as-is: %s", path, exc)
 
 def read_existing_codes(path: Path) -> Set[str]:
     """Read existing codes from CSV (ignores empty lines and normalizes to uppercase)."""
@@ -122,81 +181,113 @@ def read_existing_codes(path: Path) -> Set[str]:
         return set()
     codes: Set[str] = set()
     try:
-        with path.open("r", newline="", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if not row:
-                    continue
-                token = (row[0] or "").strip().upper()
-                # Skip a potential header row
-                if token == "CODE":
-                    continue
-                if CODE_REGEX.match(token):
+        with path.open("r", encoding="utf-8", buffering=1 << 20) as f:
+            # Only the first column is needed and codes never need CSV quoting,
+            # so a plain split is enough and skips the csv module per row
+            for line in f:
+                token = line.split(",", 1)[0].strip().strip('"').upper()
+                # fullmatch rejects the "Code" header (if present), blank lines
+                # and hand-edited junk alike
+                if CODE_REGEX.fullmatch(token):
                     codes.add(token)
     except Exception as exc:
         logging.warning("Failed to read existing CSV '%s': %s", path, exc)
     return codes
 
 
-def fetch_html(url: str, timeout: float = 10.0) -> str:
-    """Fetch page HTML with retries and timeout."""
-    session = requests_session()
+def page_cache_path(csv_path: Path) -> Path:
+    """Return the page cache location that sits next to the CSV."""
+    return csv_path.with_suffix(".cache.json")
+
+
+def _load_page_cache(path: Path, url: str) -> dict[str, str] | None:
+    """Return the cached page entry for url, or None if missing/unusable."""
     try:
-        resp = session.get(url, timeout=timeout)
+        with path.open("r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("url") != url or not cached.get("html"):
+        return None
+    return cached
+
+
+def _save_page_cache(path: Path, url: str, resp: requests.Response, html: str) -> None:
+    """Persist the page body with its validators for the next conditional GET.
+
+    A response without validators cannot be revalidated, so any older entry
+    is removed rather than left to answer a later 304 with a stale body.
+    """
+    etag = resp.headers.get("ETag", "")
+    last_modified = resp.headers.get("Last-Modified", "")
+    if not etag and not last_modified:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            logging.warning("Failed to remove stale page cache '%s': %s", path, exc)
+        return
+    entry = {"url": url, "etag": etag, "last_modified": last_modified, "html": html}
+    try:
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(entry, f)
+    except OSError as exc:
+        logging.warning("Failed to write page cache '%s': %s", path, exc)
+
+
+def fetch_html(
+    url: str,
+    timeout: float = 10.0,
+    session: requests.Session | None = None,
+    cache_path: Path | None = None,
+) -> str:
+    """Fetch page HTML with retries and timeout (on the shared session by default).
+
+    When cache_path is given, the previous response's ETag/Last-Modified are
+    sent as a conditional GET; on HTTP 304 the cached body is returned.
+    """
+    session = session or _session()
+    cached = _load_page_cache(cache_path, url) if cache_path else None
+    headers: dict[str, str] = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    try:
+        resp = session.get(url, timeout=timeout, headers=headers)
+        if resp.status_code == 304 and cached:
+            logging.info("Page not modified since last fetch; using cached copy")
+            return cached["html"]
         if resp.status_code != 200:
             raise RuntimeError(f"HTTP {resp.status_code}")
-        return resp.text
+        html = resp.text
     except Exception as exc:
         raise RuntimeError(f"Failed to fetch '{url}': {exc}") from exc
+    if cache_path:
+        _save_page_cache(cache_path, url, resp, html)
+    return html
 
 
-def extract_codes(html: str) -> List[str]:
-    """Parse HTML and extract unique SHiFT codes found anywhere in text.
+def extract_codes(html: str) -> Set[str]:
+    """Extract unique SHiFT codes found anywhere in the page's text or attributes.
 
-    This avoids brittle class-based selectors by scanning text for tokens
-    that match the SHiFT code pattern.
+    This avoids brittle class-based selectors by scanning for tokens that match
+    the SHiFT code pattern. It runs one regex pass over the raw markup rather
+    than walking a parsed tree. Character entities are not decoded, so a code
+    written with them (e.g. ``&#45;`` for a hyphen) is not found.
     """
-    soup = BeautifulSoup(html, "html.parser")
-
-    # Gather text chunks and split on whitespace/punctuation-ish boundaries.
-    # Also check attribute strings that sometimes hold codes.
-    candidates: Set[str] = set()
-
-    # 1) All text nodes
-    for text in soup.stripped_strings:
-        for token in re.split(r"[^A-Za-z0-9-]+", text):
-            token = token.strip().upper()
-            if token and CODE_REGEX.match(token):
-                candidates.add(token)
-
-    # 2) Obvious attributes (href, data-*, etc.) — defensive but cheap
-    for tag in soup.find_all(True):
-        for attr_val in tag.attrs.values():
-            if isinstance(attr_val, str):
-                for token in re.split(r"[^A-Za-z0-9-]+", attr_val):
-                    token = token.strip().upper()
-                    if token and CODE_REGEX.match(token):
-                        candidates.add(token)
-            elif isinstance(attr_val, Sequence):
-                for v in attr_val:
-                    if not isinstance(v, str):
-                        continue
-                    for token in re.split(r"[^A-Za-z0-9-]+", v):
-                        token = token.strip().upper()
-                        if token and CODE_REGEX.match(token):
-                            candidates.add(token)
-
-    return sorted(candidates)
-
-
-def extract_expired_codes(html: str) -> Set[str]:
+    content = _NON_CONTENT_REGEX.sub(" ", html)
+    return {c.upper() for c in CODE_SCAN.findall(content)}
+
+
+def extract_expired_codes(soup: BeautifulSoup) -> FrozenSet[str]:
     """Extract codes listed under the 'All Expired SHiFT Codes' section.
 
     Attempts to locate the expired section via its anchor id or a table header
-    text. Returns an empty set if the section cannot be found.
+    text. Returns an empty (frozen) set if the section cannot be found.
     """
-    soup = BeautifulSoup(html, "html.parser")
-
     # Prefer the explicit header anchor id
     expired_anchor = soup.find(id="All_Expired_SHiFT_Codes_in_Borderlands_4")
     table = None
@@ -213,27 +304,19 @@ def extract_expired_codes(html: str) -> Set[str]:
                     break
 
     if not table:
-        return set()
+        return frozenset()
 
-    expired: Set[str] = set()
-    for text in table.stripped_strings:
-        for token in re.split(r"[^A-Za-z0-9-]+", text):
-            token = token.strip().upper()
-            if token and CODE_REGEX.match(token):
-                expired.add(token)
-    return expired
+    # One text extraction for the whole table; serializing it with str(table)
+    # would also cover attributes but is far slower in BeautifulSoup
+    return frozenset(c.upper() for c in CODE_SCAN.findall(table.get_text(" ")))
 
 
-def _collect_code_tokens_from_node_text(text: str) -> List[str]:
-    tokens: List[str] = []
-    for token in re.split(r"[^A-Za-z0-9-]+", text or ""):
-        token = token.strip().upper()
-        if token and CODE_REGEX.match(token):
-            tokens.append(token)
-    return tokens
+def extract_expired_codes_from_html(html: str) -> FrozenSet[str]:
+    """Parse HTML and delegate to `extract_expired_codes`."""
+    return extract_expired_codes(make_soup(html))
 
 
-def extract_code_expirations(html: str) -> dict[str, str]:
+def extract_code_expirations(soup: BeautifulSoup) -> dict[str, str]:
     """Extract a mapping of code -> expiration text from the Active codes table.
 
     Strategy: find the table following the "All Active Borderlands 4 SHiFT Codes"
@@ -244,8 +327,6 @@ def extract_code_expirations(html: str) -> dict[str, str]:
     string (e.g., "No expiration", "Unknown Expiration ...", or the contents of
     the rendered event text such as "October 12, 2025 ...").
     """
-    soup = BeautifulSoup(html, "html.parser")
-
     # Locate the Active section table
     active_anchor = soup.find(id="All_Active_Borderlands_4_SHiFT_Codes")
     table = None
@@ -265,24 +346,22 @@ def extract_code_expirations(html: str) -> dict[str, str]:
 
     trs = table.find_all("tr", recursive=True)
     mapping: dict[str, str] = {}
+    scan = CODE_SCAN.findall  # bound once for the row loop
     i = 0
     while i < len(trs):
         tr = trs[i]
-        # Find code(s) in this row
-        row_codes: list[str] = []
-        # Search text
-        row_codes.extend(_collect_code_tokens_from_node_text(tr.get_text(" ", strip=True)))
-        # Search attributes in inputs/labels as a bonus
-        for tag in tr.find_all(True):
-            for val in tag.attrs.values():
-                if isinstance(val, str):
-                    row_codes.extend(_collect_code_tokens_from_node_text(val))
-                elif isinstance(val, Sequence):
-                    for v in val:
-                        if isinstance(v, str):
-                            row_codes.extend(_collect_code_tokens_from_node_text(v))
-        # Deduplicate
-        row_codes = sorted({c.upper() for c in row_codes})
+        # Find code(s) in this row: join its text with the string attribute
+        # values (inputs/labels) and scan once; tr.decode() would cover both
+        # but serializing is several times slower than this walk
+        parts = [tr.get_text(" ")]
+        parts.extend(
+            val
+            for tag in tr.descendants
+            if isinstance(tag, Tag)
+            for val in tag.attrs.values()
+            if isinstance(val, str)
+        )
+        row_codes = {c.upper() for c in scan(" ".join(parts))}
 
         if row_codes:
             # Default expiration text
@@ -290,8 +369,8 @@ def extract_code_expirations(html: str) -> dict[str, str]:
             # Look ahead one row for the details
             if i + 1 < len(trs):
                 nxt = trs[i + 1]
-                # Prefer the second cell if present
-                cells = nxt.find_all("td")
+                # Prefer the second cell if present; no need to collect the rest
+                cells = nxt.find_all("td", limit=2)
                 exp_container = cells[1] if len(cells) >= 2 else nxt
                 # If there is a div with class simple-event, take its text; else whole cell text
                 evt = exp_container.find(class_="simple-event")
@@ -321,11 +400,31 @@ def extract_code_expirations(html: str) -> dict[str, str]:
     return mapping
 
 
+def extract_code_expirations_from_html(html: str) -> dict[str, str]:
+    """Parse HTML and delegate to `extract_code_expirations`."""
+    return extract_code_expirations(make_soup(html))
+
+
 def _chunked(seq: Sequence[str], size: int) -> Iterable[Sequence[str]]:
     for i in range(0, len(seq), size):
         yield seq[i : i + size]
 
 
+def _chunk_lines(lines: Sequence[str], max_chars: int) -> Iterable[Sequence[str]]:
+    """Split lines into runs whose newline-joined length fits in max_chars.
+
+    A single line longer than max_chars still gets a run of its own.
+    """
+    # ends[i] is the joined length of lines[: i + 1] plus one trailing newline
+    ends = list(itertools.accumulate(len(line) + 1 for line in lines))
+    start, offset = 0, 0
+    while start < len(lines):
+        stop = bisect.bisect_right(ends, offset + max_chars + 1, lo=start)
+        stop = max(stop, start + 1)
+        yield lines[start:stop]
+        start, offset = stop, ends[stop - 1]
+
+
 def post_discord_webhook(
     webhook_url: str,
     codes: Sequence[str],
@@ -338,8 +437,9 @@ def post_discord_webhook(
     Discord clients, this composes one embed per message and lists each code
     as a bullet line in the embed description: `CODE` — expiration.
     The description has a 4096 character limit; we chunk safely.
+    Codes and `expirations` keys are expected uppercase.
     """
-    exp_map = {k.upper(): v for k, v in (expirations or {}).items()}
+    exp_map = expirations or {}
 
     if not codes:
         return
@@ -347,39 +447,22 @@ def post_discord_webhook(
     # Reasonable line budget per message so we stay under 4096 chars
     # Fallback to original batch_size if provided explicitly
     max_chars = 3900
-    session = requests_session()
+    session = _session()
 
     # Build lines once
-    lines = [f"• `{code}` — {exp_map.get(code.upper(), '') or 'Unknown'}" for code in codes]
-
-    current: list[str] = []
-    current_len = 0
-    def flush():
-        nonlocal current, current_len
-        if not current:
-            return
-        description = "\n".join(current)
+    lines = [f"• `{code}` — {exp_map.get(code, '') or 'Unknown'}" for code in codes]
+
+    for chunk in _chunk_lines(lines, max_chars):
         embed = {
             "title": "New Borderlands 4 SHiFT Codes",
             "url": DEFAULT_URL,
             "color": 0xBF1313,
-            "description": description,
+            "description": "\n".join(chunk),
         }
         payload = {"embeds": [embed], "allowed_mentions": {"parse": []}}
         resp = session.post(webhook_url, json=payload, timeout=10)
         if resp.status_code not in (200, 204):
             raise RuntimeError(f"Webhook HTTP {resp.status_code}: {resp.text[:200]}")
-        current = []
-        current_len = 0
-
-    for line in lines:
-        # If adding this line would exceed our budget, flush first
-        if current and (current_len + 1 + len(line) > max_chars):
-            flush()
-        current.append(line)
-        current_len += (1 + len(line)) if current_len else len(line)
-
-    flush()
 
 
 def post_discord_webhook_with_summary(
@@ -394,30 +477,24 @@ def post_discord_webhook_with_summary(
 
     - Lists each new code as: `CODE` — expiration
     - Adds a "Redemption Summary" field with per-user counts when provided.
+    Codes and `expirations` keys are expected uppercase.
     """
-    exp_map = {k.upper(): v for k, v in (expirations or {}).items()}
+    exp_map = expirations or {}
 
     if not codes:
         return
 
     max_chars = 3900
-    session = requests_session()
-
-    lines = [f"• `{code}` — {exp_map.get(code.upper(), '') or 'Unknown'}" for code in codes]
+    session = _session()
 
-    current: list[str] = []
-    current_len = 0
+    lines = [f"• `{code}` — {exp_map.get(code, '') or 'Unknown'}" for code in codes]
 
-    def flush():
-        nonlocal current, current_len
-        if not current:
-            return
-        description = "\n".join(current)
+    for chunk in _chunk_lines(lines, max_chars):
         embed = {
             "title": "New Borderlands 4 SHiFT Codes",
             "url": DEFAULT_URL,
             "color": 0xBF1313,
-            "description": description,
+            "description": "\n".join(chunk),
         }
         if user_success_counts:
             total = total_attempted if total_attempted is not None else len(codes)
@@ -436,46 +513,44 @@ def post_discord_webhook_with_summary(
         resp = session.post(webhook_url, json=payload, timeout=10)
         if resp.status_code not in (200, 204):
             raise RuntimeError(f"Webhook HTTP {resp.status_code}: {resp.text[:200]}")
-        current = []
-        current_len = 0
 
-    for line in lines:
-        if current and (current_len + 1 + len(line) > max_chars):
-            flush()
-        current.append(line)
-        current_len += (1 + len(line)) if current_len else len(line)
 
-    flush()
-
-
-def try_extract_by_class(html: str, tag: str, class_tokens: Sequence[str]) -> tuple[List[str], bool]:
+def try_extract_by_class(
+    soup: BeautifulSoup, tag: str, class_tokens: Sequence[str]
+) -> tuple[Set[str], bool]:
     """Attempt to extract codes from elements matching tag + all class tokens.
 
     Returns a tuple (codes, matched) where `matched` indicates whether any
     elements matched the selector at all. If elements matched but yielded no
-    valid codes, the codes list will be empty.
+    valid codes, the codes set will be empty.
     """
-    soup = BeautifulSoup(html, "html.parser")
-    selector = tag
-    if class_tokens:
-        selector += "." + ".".join(token.strip() for token in class_tokens if token.strip())
-    try:
-        elements = soup.select(selector)
-    except Exception as exc:
-        logging.debug("Invalid selector '%s': %s", selector, exc)
-        return ([], False)
+    # Equivalent to the CSS selector tag.token1.token2, but matched via
+    # find_all + a class-set check, which avoids SoupSieve's per-node overhead
+    wanted = {token.strip() for token in class_tokens if token.strip()}
+    if class_tokens and not wanted:
+        # Only blank tokens: the CSS form ("tag.") is not a valid selector
+        return (set(), False)
+    # HTML tag names are case-insensitive, as they are for the CSS selector
+    name = tag.strip().lower() if tag else ""
+    elements = [
+        el
+        for el in soup.find_all(name if name and name != "*" else True)
+        if wanted.issubset(el.get("class") or ())
+    ]
 
     if not elements:
-        return ([], False)
+        return (set(), False)
+
+    all_text = " ".join(el.get_text(" ", strip=True) for el in elements)
+    candidates = {c.upper() for c in CODE_SCAN.findall(all_text)}
+    return (candidates, True)
+
 
-    candidates: Set[str] = set()
-    for el in elements:
-        text = el.get_text(" ", strip=True)
-        for token in re.split(r"[^A-Za-z0-9-]+", text):
-            token = token.strip().upper()
-            if token and CODE_REGEX.match(token):
-                candidates.add(token)
-    return (sorted(candidates), True)
+def try_extract_by_class_from_html(
+    html: str, tag: str, class_tokens: Sequence[str]
+) -> tuple[Set[str], bool]:
+    """Parse HTML and delegate to `try_extract_by_class`."""
+    return try_extract_by_class(make_soup(html), tag, class_tokens)
 
 
 def write_new_codes(
@@ -487,26 +562,27 @@ def write_new_codes(
 ) -> int:
     """Append new codes to CSV with date, expiration (if known), and default Redeemed flag.
 
-    Returns the number of codes written.
+    Codes and `expirations` keys are expected uppercase, as produced by the
+    extractors. Returns the number of codes written.
     """
-    exp_map = {k.upper(): v for k, v in (expirations or {}).items()}
+    exp_map = expirations or {}
+    # Materialize once, straight into CSV rows: `codes` may be a one-shot iterator
+    rows = [(code, date_str, exp_map.get(code, ""), "No") for code in codes]
 
     if dry_run:
-        for code in codes:
-            logging.info(
-                "Would add code: %s (expires: %s)", code, exp_map.get(code.upper(), "")
-            )
-        return len(list(codes))
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            for code, _, expiration, _ in rows:
+                logging.info("Would add code: %s (expires: %s)", code, expiration)
+        return len(rows)
 
-    wrote = 0
-    with path.open("a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        for code in codes:
-            expiration = exp_map.get(code.upper(), "")
-            writer.writerow([code, date_str, expiration, "No"])
-            logging.info("Added code: %s%s", code, f" (expires: {expiration})" if expiration else "")
-            wrote += 1
-    return wrote
+    with path.open("a", newline="", encoding="utf-8", buffering=1 << 16) as f:
+        csv.writer(f).writerows(rows)
+    if rows:
+        logging.info("Added %d code(s): %s", len(rows), ", ".join(row[0] for row in rows))
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        for code, _, expiration, _ in rows:
+            logging.debug("Added code: %s (expires: %s)", code, expiration or "unknown")
+    return len(rows)
 
 
 def parse_args(argv: Sequence[str]) -> argparse.Namespace:
@@ -533,6 +609,11 @@ def parse_args(argv: Sequence[str]) -> argparse.Namespace:
         action="store_true",
         help="Pause for Enter before exiting (useful when double-clicked).",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always refetch the page instead of sending a conditional request",
+    )
     parser.add_argument(
         "--include-expired",
         action="store_true",
@@ -564,11 +645,16 @@ def main(argv: Sequence[str]) -> int:
     logging.info("Existing codes: %d", len(existing))
 
     try:
-        html = fetch_html(args.url)
+        # A dry run must not write anything, including the page cache
+        use_cache = not (args.no_cache or args.dry_run)
+        html = fetch_html(args.url, cache_path=page_cache_path(csv_path) if use_cache else None)
     except RuntimeError as e:
         logging.error("%s", e)
         return 1
 
+    # Parse once; every extractor below shares this tree
+    soup = make_soup(html)
+
     # Determine class tokens to use (unless disabled)
     class_tokens: Sequence[str] | None
     if args.no_class_hint:
@@ -576,11 +662,9 @@ def main(argv: Sequence[str]) -> int:
     else:
         class_tokens = args.class_token if args.class_token else CLASS_TOKENS_DEFAULT
 
-    scraped: List[str] = []
-    used_selector = False
+    scraped: Set[str] = set()
     if class_tokens:
-        class_codes, matched = try_extract_by_class(html, args.class_tag, class_tokens)
-        used_selector = matched
+        class_codes, matched = try_extract_by_class(soup, args.class_tag, class_tokens)
         if matched:
             logging.info("Class-based scan matched %d element(s)", len(class_codes))
             if not class_codes:
@@ -589,32 +673,35 @@ def main(argv: Sequence[str]) -> int:
             logging.warning(
                 "No elements matched selector: %s.%s; falling back to page-wide scan",
                 args.class_tag,
-                "." + ".".join(class_tokens),
+                ".".join(class_tokens),
             )
         scraped = class_codes
 
-    if not scraped:
+    # Only pay for the page-wide scan when the class-based scan came up empty
+    used_fallback = not scraped
+    if used_fallback:
         scraped = extract_codes(html)
 
-    logging.info("Found %d codes on page%s", len(scraped), " (fallback scan)" if not used_selector else "")
+    logging.info("Found %d codes on page%s", len(scraped), " (fallback scan)" if used_fallback else "")
 
     # Exclude explicitly expired codes (by page section) unless requested
+    candidates = scraped
     if not args.include_expired:
-        expired = extract_expired_codes(html)
+        expired = extract_expired_codes(soup)
         if expired:
-            before = len(scraped)
-            scraped = [c for c in scraped if c not in expired]
-            removed = before - len(scraped)
+            before = len(candidates)
+            candidates = candidates - expired
+            removed = before - len(candidates)
             logging.info("Excluded %d expired code(s) via page section", removed)
         else:
             logging.debug("No expired section or no expired codes found.")
 
-    new_codes = [c for c in scraped if c not in existing]
+    new_codes = sorted(candidates - existing)
     logging.info("New codes to add: %d", len(new_codes))
 
     # Build expiration mapping from the Active table for context in CSV
-    exp_map = extract_code_expirations(html)
-    today = dt.datetime.now().strftime("%Y-%m-%d")
+    exp_map = extract_code_expirations(soup)
+    today = dt.date.today().isoformat()
     wrote = write_new_codes(
         csv_path, new_codes, today, dry_run=args.dry_run, expirations=exp_map
     )
@@ -639,7 +726,10 @@ def main(argv: Sequence[str]) -> int:
 
 
 if __name__ == "__main__":
-    exit_code = main(sys.argv[1:])
+    try:
+        exit_code = main(sys.argv[1:])
+    finally:
+        close_session()
     # Keep console window open when double-clicked (no args), or when --pause is provided.
     try:
         if ("--pause" in sys.argv) or (len(sys.argv) == 1 and sys.stdin and sys.stdin.isatty()):